@@ -0,0 +1,364 @@
+# common.py
+# Shared pieces of the dashboard (app.py; app_local.py just runs app.py):
+# page theme, Supabase client, cached loaders, aggregations and summary.
+# Living in one module means the client and caches are shared process-wide.
+
+import os
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from supabase import create_client
+from dotenv import load_dotenv
+from pathlib import Path
+
+# Read .env once per process, not inside the client factory
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+# --------------------------------------
+# Page config + theme
+# --------------------------------------
+PAGE_CSS = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap');
+html, body, [class*="css"] { font-family: 'Poppins', sans-serif !important; }
+h1,h2,h3,h4 { font-family:'Poppins',sans-serif!important;font-weight:600;color:#0B3D91; }
+.block-container {max-width:1200px;padding-top:1rem;}
+.stCard {background:#f9fafb;padding:1.1rem;border-radius:.75rem;
+         box-shadow:0 2px 6px rgba(0,0,0,0.05);margin-bottom:1.5rem;}
+</style>
+"""
+
+def setup_page():
+    st.set_page_config(page_title="Fraud Dashboard", layout="wide")
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+# --------------------------------------
+# Chart specs (plain Vega-Lite, built once per process;
+# no Altair objects or schema validation on reruns)
+# --------------------------------------
+BAR_CHART_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "keyword", "type": "nominal", "title": "Keyword"},
+        "y": {"field": "count", "type": "quantitative", "title": "Total Mentions"},
+        "tooltip": [
+            {"field": "keyword", "type": "nominal"},
+            {"field": "count", "type": "quantitative"}
+        ]
+    },
+    "height": 350
+}
+
+LINE_CHART_SPEC = {
+    "mark": {
+        "type": "line",
+        "point": {"filled": True, "size": 90},
+        "strokeWidth": 5
+    },
+    "encoding": {
+        "x": {"field": "year", "type": "ordinal", "title": "Year"},
+        "y": {"field": "count", "type": "quantitative", "title": "Mentions"},
+        "color": {"field": "keyword", "type": "nominal", "title": "Keyword"},
+        "tooltip": [
+            {"field": "year", "type": "ordinal"},
+            {"field": "keyword", "type": "nominal"},
+            {"field": "count", "type": "quantitative"}
+        ]
+    },
+    "height": 250
+}
+
+HEATMAP_SPEC = {
+    "mark": "rect",
+    "encoding": {
+        "x": {"field": "year", "type": "ordinal", "title": "Year"},
+        "y": {"field": "keyword", "type": "nominal", "title": "Keyword"},
+        "color": {"field": "count", "type": "quantitative", "title": "Intensity"},
+        "tooltip": [
+            {"field": "year", "type": "ordinal"},
+            {"field": "keyword", "type": "nominal"},
+            {"field": "count", "type": "quantitative"}
+        ]
+    },
+    "height": 350
+}
+
+# --------------------------------------
+# Helpers
+# --------------------------------------
+@lru_cache(maxsize=256)
+def pretty_keyword_name(kw: str) -> str:
+    if kw is None:
+        return ""
+    return str(kw).replace("_", " ").title()
+
+# One client per server process so its HTTP session (keep-alive) is reused
+@st.cache_resource
+def get_supabase_client():
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        st.error("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
+        st.stop()
+    return create_client(url, key)
+
+# --------------------------------------
+# Load data from Supabase
+# --------------------------------------
+# Only the columns shown in the Keyword Records table
+FRAUD_KEYWORDS_COLUMNS = "year,date,keyword,count,title"
+
+@st.cache_data
+def load_fraud_keywords() -> pd.DataFrame:
+    sb = get_supabase_client()
+    try:
+        try:
+            resp = sb.table("fraud_keywords").select(FRAUD_KEYWORDS_COLUMNS).execute()
+        except Exception:
+            # Older tables don't have every display column
+            resp = sb.table("fraud_keywords").select("*").execute()
+        df = pd.DataFrame(resp.data or [])
+    except Exception:
+        return pd.DataFrame()
+
+    # Parsed once here; the page code relies on "year" always being present
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce", format="ISO8601")
+        df["year"] = df["date"].dt.year.astype("Int16")
+    elif "year" in df.columns:
+        df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int16")
+    else:
+        df["year"] = pd.Series(pd.NA, index=df.index, dtype="Int16")
+
+    # Same narrow dtypes as the keyword totals
+    if "keyword" in df.columns:
+        df["keyword"] = df["keyword"].astype("category")
+    if "count" in df.columns:
+        df["count"] = pd.to_numeric(df["count"], errors="coerce", downcast="integer")
+
+    return df
+
+# Refetch fraud_reports aggregates at most hourly
+DATA_TTL = 3600
+
+# RPC rows are decoded straight into these narrow Arrow types
+# (keyword dictionary-encoded -> pandas category)
+KEYWORD_TOTALS_SCHEMA = pa.schema([
+    ("year", pa.int16()),
+    ("keyword", pa.dictionary(pa.int32(), pa.string())),
+    ("count", pa.int32())
+])
+
+# fraud_reports is aggregated in Postgres (see sql/keyword_totals.sql),
+# so only one row per (year, keyword) comes over the wire. Passing a year
+# filters server-side; each distinct year is cached separately.
+@st.cache_data(ttl=DATA_TTL)
+def load_keyword_year_totals(year: int | None = None) -> pd.DataFrame:
+    sb = get_supabase_client()
+    resp = sb.rpc("keyword_totals", {"p_year": year}).execute()
+    table = pa.Table.from_pylist(resp.data or [], schema=KEYWORD_TOTALS_SCHEMA)
+    df = table.to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get)
+    # Nulls make Arrow hand back float; counts are never missing for the charts
+    df["count"] = df["count"].fillna(0).astype("int32")
+    return df
+
+@st.cache_data(ttl=DATA_TTL)
+def load_top_k(k: int, year: int | None = None) -> pd.DataFrame:
+    sb = get_supabase_client()
+    resp = sb.rpc("keyword_top_k", {"p_k": k, "p_year": year}).execute()
+    df = pd.DataFrame(resp.data or [], columns=["keyword", "count"])
+    df["count"] = pd.to_numeric(df["count"], errors="coerce").fillna(0).astype("int32")
+    return df
+
+# --------------------------------------
+# Aggregations (cached per filter selection, so reruns
+# from unrelated widgets don't redo the groupbys)
+# --------------------------------------
+# Keyword dropdown options, most mentioned first. Depends only on the data,
+# not on any widget, so it is computed once per data refresh.
+@st.cache_data(ttl=DATA_TTL)
+def keyword_universe() -> list[str]:
+    return (
+        load_keyword_year_totals()
+        .groupby("keyword", sort=False, observed=True)["count"]
+        .sum()
+        .sort_values(ascending=False)
+        .index.tolist()
+    )
+
+@st.cache_data(ttl=DATA_TTL)
+def compute_aggregates(year_choice: str, keyword_choice: str):
+    # fraud_reports filtered by year (in the RPC, not in pandas)
+    year = None if year_choice == "All" else int(year_choice)
+    df_rep = load_keyword_year_totals(year)
+
+    # fraud_reports filtered by keyword
+    if keyword_choice == "All Keywords":
+        df_rep_kw = df_rep
+    else:
+        df_rep_kw = df_rep[df_rep["keyword"] == keyword_choice]
+
+    if keyword_choice == "All Keywords":
+        top5 = load_top_k(5, year)
+    else:
+        # Only the focused keyword survives the filter, so its total is a plain sum
+        top5 = pd.DataFrame({
+            "keyword": [keyword_choice],
+            "count": [int(df_rep_kw["count"].sum())]
+        })
+
+    top3 = list(top5["keyword"].head(3))
+
+    # Rows are already unique per (year, keyword), so no regrouping is needed
+    trend_df = df_rep_kw[df_rep_kw["keyword"].isin(top3)]
+
+    return df_rep_kw, top5, top3, trend_df
+
+# fraud_keywords rows for the Keyword Records table, plus the years they
+# cover (for the summary). Cached per year filter like the aggregates.
+@st.cache_data
+def compute_keyword_records(year_choice: str):
+    df_fk = load_fraud_keywords()
+    if df_fk.empty:
+        return pd.DataFrame(), ()
+
+    if year_choice == "All":
+        df_fk_filtered = df_fk
+    else:
+        df_fk_filtered = df_fk[df_fk["year"] == int(year_choice)]
+
+    fk_years = tuple(sorted(df_fk_filtered["year"].dropna().unique()))
+
+    preferred_cols = ["year", "date", "keyword", "count", "title"]
+    cols_to_show = [c for c in preferred_cols if c in df_fk_filtered.columns]
+
+    if cols_to_show:
+        df_fk_display = df_fk_filtered[cols_to_show]
+    else:
+        df_fk_display = df_fk_filtered
+
+    if "date" in df_fk_display.columns:
+        df_fk_display = df_fk_display.sort_values("date", ascending=False)
+    elif "year" in df_fk_display.columns:
+        df_fk_display = df_fk_display.sort_values("year", ascending=False)
+
+    rename_map = {
+        "year": "Year",
+        "date": "Date",
+        "keyword": "Keyword",
+        "count": "Count",
+        "title": "Title"
+    }
+    df_fk_display = df_fk_display.rename(
+        columns={k: v for k, v in rename_map.items() if k in df_fk_display.columns}
+    )
+
+    return df_fk_display, fk_years
+
+# --------------------------------------
+# Summary text (cached per filter selection; takes hashable
+# tuples instead of DataFrames)
+# --------------------------------------
+@st.cache_data
+def build_summary(
+    year_choice: str,
+    keyword_choice: str,
+    top5_rows: tuple,
+    years_in_view: tuple,
+    total_mentions: int,
+    fk_record_count: int,
+    fk_years: tuple
+) -> str:
+    summary_lines = []
+
+    # Time window summary
+    if year_choice == "All":
+        if len(years_in_view) >= 2:
+            summary_lines.append(
+                f"- This view covers fraud keyword activity from **{years_in_view[0]} to {years_in_view[-1]}**."
+            )
+        elif len(years_in_view) == 1:
+            summary_lines.append(
+                f"- This view shows fraud keyword activity for the year **{years_in_view[0]}**."
+            )
+    else:
+        summary_lines.append(f"- The charts are filtered to the year **{year_choice}**.")
+
+    # Data source context
+    summary_lines.append(
+        "- The charts are built using keyword counts from the project’s Supabase tables. "
+        "Counts are grouped by year and keyword to highlight key fraud patterns."
+    )
+
+    # Keyword focus
+    if keyword_choice != "All Keywords":
+        pretty_focus = pretty_keyword_name(keyword_choice)
+        summary_lines.append(f"- The current focus is on the keyword **{pretty_focus}**.")
+        summary_lines.append(
+            "- The line chart and keyword details reflect how often this keyword appears over time."
+        )
+
+    # Top trends from the top 3
+    top3 = [kw for kw, _ in top5_rows[:3]]
+    if len(top3) >= 1:
+        main_name = pretty_keyword_name(top3[0])
+        summary_lines.append(
+            f"- The most common trend in this view is **{main_name}**, which appears more often than other keywords."
+        )
+
+    if len(top3) >= 2:
+        other_names = [pretty_keyword_name(k) for k in top3[1:]]
+        if other_names:
+            summary_lines.append(
+                "- Other major keywords in this view include: "
+                + ", ".join(f"**{name}**" for name in other_names) + "."
+            )
+
+    # Top 5 overview with counts
+    summary_lines.append("- In this filtered view, the **Top 5 fraud keywords by total mentions** are:")
+    summary_lines.extend(
+        f"  - **{pretty_keyword_name(kw)}** – {cnt} mentions." for kw, cnt in top5_rows
+    )
+
+    # Total mentions
+    summary_lines.append(
+        f"- Across all selected records, there are **{total_mentions} total keyword mentions** in this view."
+    )
+
+    # fraud_keywords records context
+    if fk_record_count:
+        summary_lines.append(
+            f"- There are **{fk_record_count} individual keyword records** under the current filter, "
+            f"with entries from years: {', '.join(str(y) for y in fk_years)}."
+        )
+
+    # High-level interpretation
+    summary_lines.append(
+        "- Together, the bar chart, line chart, heatmap, and records table show which fraud types are most common, "
+        "how they change over time, and how many individual records support those trends."
+    )
+
+    return "\n".join(summary_lines)
+
+# --------------------------------------
+# Startup load
+# --------------------------------------
+def load_dashboard_data():
+    # Build the client on the script thread (it may st.stop()), then fetch
+    # both tables concurrently so cold start costs one round-trip, not two.
+    # fraud_keywords is only loaded here to warm its cache for the records table.
+    get_supabase_client()
+    with ThreadPoolExecutor(
+        max_workers=2,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    ) as ex:
+        fk_future = ex.submit(load_fraud_keywords)
+        kw_future = ex.submit(load_keyword_year_totals)
+        fk_future.result()
+        df_keywords = kw_future.result()
+
+    return df_keywords
@@ -1,4 +1,4 @@
-import re
+import ahocorasick
 
 CRIME_PATTERNS = {
     "phishing": ["phishing", "phishings", "spoofing", "spoofings", "email scam", "email scams", "email fraud", "email frauds", "fake email", "fake emails", "smishing", "smishings", "vishing", "vishings"],
@@ -29,4 +29,16 @@ CRIME_PATTERNS = {
 }
 
 
-FRAUD_REGEX = {k: re.compile("|".join([re.escape(term) for term in v]), re.I) for k, v in CRIME_PATTERNS.items()}
\ No newline at end of file
+# Every term of every category in one Aho-Corasick automaton, so a text is
+# scanned once for all categories instead of once per category.
+def _build_automaton():
+    automaton = ahocorasick.Automaton()
+    for category, terms in CRIME_PATTERNS.items():
+        for term in terms:
+            automaton.add_word(term.lower(), (category, term))
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_automaton()
+
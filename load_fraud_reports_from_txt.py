@@ -1,42 +1,34 @@
-from supabase import create_client
-from dotenv import load_dotenv
-import os
+from pathlib import Path
 
-load_dotenv()
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-
-supabase = create_client(url, key)
+from loader import insert_in_batches
 
 def load_reports_from_text():
-    file_path = "fraud_reports.txt"
+    file_path = Path("fraud_reports.txt")
 
-    if not os.path.exists(file_path):
+    if not file_path.exists():
         print(f"File not found: {file_path}")
         return
 
-    rows = []
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            year = 2023  # change later if needed
-            title = line[:60] + "..." if len(line) > 60 else line
+    # One read + splitlines instead of iterating the file line by line
+    text = file_path.read_text(encoding="utf-8")
+    lines = [line for line in map(str.strip, text.splitlines()) if line]
 
-            rows.append({
-                "year": year,
-                "title": title,
-                "report_text": line,
-            })
+    year = 2023  # change later if needed
+    rows = [
+        {
+            "year": year,
+            "title": line[:60] + "..." if len(line) > 60 else line,
+            "report_text": line,
+        }
+        for line in lines
+    ]
 
     if not rows:
         print("No non-empty lines in fraud_reports.txt")
         return
 
-    response = supabase.table("fraud_reports").insert(rows).execute()
+    # Batched so a large file doesn't become one oversized request
+    insert_in_batches("fraud_reports", rows)
     print(f"Inserted {len(rows)} rows into fraud_reports.")
 
 if __name__ == "__main__":
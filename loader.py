@@ -1,5 +1,6 @@
 from supabase import create_client
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 import os
 
 # Load .env values
@@ -10,6 +11,19 @@ key = os.getenv("SUPABASE_KEY")
 
 supabase = create_client(url, key)
 
+# Rows per request and how many requests are in flight at once
+BATCH_SIZE = 1000
+MAX_WORKERS = 8
+
+def insert_in_batches(table, rows):
+    """
+    Insert rows into a Supabase table in chunks of BATCH_SIZE, sending
+    up to MAX_WORKERS chunks concurrently. Returns one response per chunk.
+    """
+    chunks = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        return list(ex.map(lambda chunk: supabase.table(table).insert(chunk).execute(), chunks))
+
 def upload_keywords(data):
     """
     data should be a list of dictionaries like:
@@ -18,8 +32,7 @@ def upload_keywords(data):
         ...
     ]
     """
-    response = supabase.table("fraud_keywords").insert(data).execute()
-    return response
+    return insert_in_batches("fraud_keywords", data)
 
 if __name__ == "__main__":
     # 🔹 Add as many rows as you want here
@@ -37,4 +50,4 @@ if __name__ == "__main__":
     ]
 
     result = upload_keywords(sample_data)
-    print("Inserted rows:", result)
+    print("Inserted rows:", sum(len(r.data) for r in result))
@@ -1,13 +1,52 @@
 import os
 import re
+import csv
+import json
+import shutil
+import string
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import fitz  # PyMuPDF
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urljoin
 
-from crime_keywords import FRAUD_REGEX 
+from crime_keywords import CRIME_PATTERNS, KEYWORD_AUTOMATON
+
+# One keep-alive session for every request to ic3.gov; the pool is sized
+# for the concurrent downloads below.
+DOWNLOAD_WORKERS = 16
+
+# Retries back off exponentially (0.5s, 1s, 2s, ...) and also cover
+# rate limiting and transient server errors, not just connection failures
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=RETRY, pool_maxsize=32))
+
+# Regexes compiled once; is_meaningful_sentence runs for every sentence of every PDF
+JUNK_PATTERNS = [
+    r"\$HTTP_PORTS", r"alert tcp", r"sid:\d+", r"http_header", r"http_uri",
+    r"flowbits", r"pcre:", r"\|[0-9A-Fa-f]{2}\|",
+    r"rev:\d+", r"msg:", r"metadata:", r"classtype:", r"content:",
+]
+_JUNK_RE = re.compile("|".join(JUNK_PATTERNS), re.IGNORECASE)
+_URL_RE = re.compile(r"https?://|www\.|\.(?:com|gov|ru|top|net)")
+_CODE_RE = re.compile(r"[;{}<>@|$]")
+_WS_RE = re.compile(r"\s+")
+_ALPHA_SPACE_TABLE = str.maketrans("", "", string.ascii_letters + " ")
+_DATE_RE = re.compile(r"\b\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\b")
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
 
 # -------------------------------
 # Helper functions
@@ -15,51 +54,44 @@ from crime_keywords import FRAUD_REGEX
 
 def get_quarter(date):
     """Return quarter number (1-4) from datetime."""
-    month = date.month
-    if month <= 3:
-        return 1
-    elif month <= 6:
-        return 2
-    elif month <= 9:
-        return 3
-    else:
-        return 4
+    return (date.month + 2) // 3
 
 
-def is_meaningful_sentence(sentence: str) -> bool:
+# Cached: IC3 alerts repeat the same boilerplate (disclaimers, contact
+# details) across many PDFs
+@lru_cache(maxsize=65536)
+def is_meaningful_sentence(s: str) -> bool:
     """
     Heuristically determine if a sentence is meaningful English text,
-    not a code snippet, rule, or junk.
+    not a code snippet, rule, or junk. Expects whitespace already
+    collapsed to single spaces (see find_keywords_and_sentences).
     """
-    s = sentence.strip()
-    s = re.sub(r'\s+', ' ', s)
-
-    # Too short or too long
-    if len(s.split()) < 5 or len(s) < 30:
+    # Too short or too long (character length first; split() allocates)
+    if len(s) < 30 or len(s) > 1000:
         return False
-    if len(s) > 1000:
+    if len(s.split()) < 5:
         return False
 
-    # Too many symbols
-    non_alpha_ratio = sum(1 for c in s if not c.isalpha() and c != ' ') / len(s)
-    if non_alpha_ratio > 0.4:
-        return False
+    # Cheapest and most selective checks first: a single character class,
+    # then URLs, then the junk alternation; the symbol ratio runs last
 
-    # Known junk patterns
-    patterns = [
-        r"\$HTTP_PORTS", r"alert tcp", r"sid:\d+", r"http_header", r"http_uri",
-        r"flowbits", r"pcre:", r"\|[0-9A-Fa-f]{2}\|",
-        r"rev:\d+", r"msg:", r"metadata:", r"classtype:", r"content:",
-    ]
-    if any(re.search(p, s, re.IGNORECASE) for p in patterns):
+    # Code-like symbols
+    if _CODE_RE.search(s):
         return False
 
     # URL or domain heavy
-    if re.search(r"https?://|www\.|\.com|\.gov|\.ru|\.top|\.net", s):
+    if _URL_RE.search(s):
         return False
 
-    # Code-like symbols
-    if re.search(r"[;{}<>@|$]", s):
+    # Known junk patterns
+    if _JUNK_RE.search(s):
+        return False
+
+    # Too many symbols
+    # translate() drops ASCII letters and spaces in C; only non-ASCII leftovers need isalpha()
+    rest = s.translate(_ALPHA_SPACE_TABLE)
+    non_alpha = len(rest) if rest.isascii() else len(rest) - sum(map(str.isalpha, rest))
+    if non_alpha / len(s) > 0.4:
         return False
 
     return True
@@ -67,13 +99,16 @@ def is_meaningful_sentence(sentence: str) -> bool:
 
 def scrape_pdf_links(page_url):
     """Return list of dicts: [{'title': ..., 'url': ..., 'date': datetime}, ...]"""
-    response = requests.get(page_url)
+    response = SESSION.get(page_url, timeout=30)
     if response.status_code != 200:
         print(f"Error fetching {page_url}: Status {response.status_code}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    # lxml is the C parser; it takes the raw bytes and sniffs the encoding itself.
+    # No SoupStrainer: the date lives in each link's parent element.
+    soup = BeautifulSoup(response.content, "lxml")
     pdf_entries = []
+    parent_dates = {}  # id(parent) -> date; links sharing a parent share its text
 
     for a_tag in soup.find_all("a", href=True):
         href = a_tag['href']
@@ -81,17 +116,17 @@ def scrape_pdf_links(page_url):
             title = a_tag.get_text(strip=True)
             full_url = urljoin(page_url, href)
 
-            # Extract date from surrounding text
-            date_text = ""
-            parent = a_tag.find_parent()
-            if parent:
-                date_text = parent.get_text(" ", strip=True)
-
-            date_match = re.search(r"\b\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\b", date_text)
-            if date_match:
-                date_obj = datetime.strptime(date_match.group(0), "%a, %d %b %Y")
-            else:
-                date_obj = None
+            # Extract date from surrounding text, once per parent element
+            parent = a_tag.parent
+            key = id(parent)
+            if key not in parent_dates:
+                date_text = parent.get_text(" ", strip=True) if parent else ""
+                date_match = _DATE_RE.search(date_text)
+                if date_match:
+                    parent_dates[key] = datetime.strptime(date_match.group(0), "%a, %d %b %Y")
+                else:
+                    parent_dates[key] = None
+            date_obj = parent_dates[key]
 
             pdf_entries.append({
                 "title": title,
@@ -102,67 +137,134 @@ def scrape_pdf_links(page_url):
     return pdf_entries
 
 
-def download_pdf(url, folder="pdfs"):
-    """Download PDF to folder and return local file path."""
-    os.makedirs(folder, exist_ok=True)
+def download_pdf(url, folder="pdfs", existing=None):
+    """
+    Download PDF to folder and return local file path.
+    existing: names already in folder (one os.scandir by the caller); when
+    given, cached PDFs are found without a stat() per file.
+    """
     filename = os.path.basename(url)
     path = os.path.join(folder, filename)
-    if os.path.exists(path):
-        return path  # skip download
-    r = requests.get(url)
-    if r.status_code == 200:
-        with open(path, "wb") as f:
-            f.write(r.content)
-        print(f"Downloaded: {filename}")
-        return path
+    if existing is not None:
+        if filename in existing:
+            return path  # skip download
     else:
-        print(f"Failed to download {filename}")
-        return None
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(path):
+            return path  # skip download
+    with SESSION.get(url, stream=True, timeout=30) as r:
+        if r.status_code != 200:
+            print(f"Failed to download {filename}")
+            return None
+        # Stream in 64 KiB chunks to a temp name so an interrupted download
+        # is never mistaken for a cached PDF by the check above
+        r.raw.decode_content = True
+        tmp_path = path + ".part"
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(r.raw, f, length=1 << 16)
+        os.replace(tmp_path, path)
+    print(f"Downloaded: {filename}")
+    return path
 
 
 def extract_text(pdf_path):
     """Extract all text from PDF using PyMuPDF."""
-    text = ""
+    parts = []
     try:
         with fitz.open(pdf_path) as doc:
             for page in doc:
-                text += page.get_text("text") + " "
+                parts.append(page.get_text("text"))
     except Exception as e:
         print(f"Error reading {pdf_path}: {e}")
+    return " ".join(parts)
+
+
+def load_text(pdf_path):
+    """Return the PDF's text, reusing a .txt copy saved next to it when it is newer than the PDF."""
+    txt_path = pdf_path + ".txt"
+    if os.path.exists(txt_path) and os.path.getmtime(txt_path) >= os.path.getmtime(pdf_path):
+        with open(txt_path, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    text = extract_text(pdf_path)
+    if text.strip():  # leave failed extractions uncached so they are retried
+        # Temp name + os.replace, as in download_pdf: an interrupted write must
+        # never leave a truncated .txt that looks newer than its PDF
+        tmp_path = txt_path + ".part"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp_path, txt_path)
     return text
 
 
+def sentence_spans(text):
+    """Yield (start, end) offsets of the pieces _SENT_SPLIT.split(text) would return."""
+    start = 0
+    for m in _SENT_SPLIT.finditer(text):
+        yield start, m.start()
+        start = m.end()
+    yield start, len(text)
+
+
+def lower_keep_offsets(text):
+    """text.lower(), except characters whose lowercase form is longer are left alone."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
 def find_keywords_and_sentences(text):
     """Return a dict of keyword counts and summary sentences containing them."""
-    counts = {}
-    summary_sentences = []
-
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    # Collapse whitespace once for the whole document; sentences, the junk
+    # filter and the summary then all work on single-spaced text
+    text = _WS_RE.sub(" ", text).strip()
+
+    spans = list(sentence_spans(text))
+    starts = [start for start, _ in spans]
+
+    # One Aho-Corasick pass over the whole document; each hit is mapped to the
+    # sentence holding its last character (terms never span a sentence break)
+    hits = {}  # sentence index -> keywords found in it
+    for end, (keyword, _) in KEYWORD_AUTOMATON.iter(lower_keep_offsets(text)):
+        hits.setdefault(bisect_right(starts, end) - 1, set()).add(keyword)
+
+    matched = {}  # keyword -> matching sentences, in text order
+    for i in sorted(hits):
+        start, end = spans[i]
+        sent = text[start:end]
+        if not is_meaningful_sentence(sent):  # 🔥 filter junk here
+            continue
+        for keyword in CRIME_PATTERNS:
+            if keyword in hits[i]:
+                matched.setdefault(keyword, []).append(sent)
 
-    for keyword, pattern in FRAUD_REGEX.items():
-        match_count = 0
-        for sent in sentences:
-            if pattern.search(sent):
-                if is_meaningful_sentence(sent):  # 🔥 filter junk here
-                    match_count += 1
-                    summary_sentences.append(sent.strip())
-        if match_count > 0:
-            counts[keyword] = match_count
+    counts = {k: len(matched[k]) for k in CRIME_PATTERNS if k in matched}
+    summary_sentences = [s for k in counts for s in matched[k]]
 
     # Deduplicate sentences while preserving order
     summary_sentences = list(dict.fromkeys(summary_sentences))
 
-    # Join into one long line, remove newlines
-    summary = " ".join(summary_sentences).replace("\n", " ").replace("\r", " ")
+    # Join into one long line (newlines were collapsed above)
+    summary = " ".join(summary_sentences)
 
     return counts, summary
 
 
+def analyze_pdf(pdf_path):
+    """Return (keyword counts, summary) for a PDF, or None if it has no text. Runs in a worker process."""
+    text = load_text(pdf_path)
+    if not text.strip():
+        return None
+    return find_keywords_and_sentences(text)
+
+
 # -------------------------------
 # Main pipeline
 # -------------------------------
 
 CSV_FILE = "pdf_summaries.csv"
+CSV_FIELDS = ["title", "date", "quarter", "keyword_counts", "summary"]
 
 urls = {
     2020: "https://www.ic3.gov/CSA/2020",
@@ -173,38 +275,91 @@ urls = {
     2025: "https://www.ic3.gov/CSA/2025"
 }
 
-all_rows = []
-
-for year, page_url in urls.items():
-    print(f"\nScraping {year} CSA page...")
-    pdf_entries = scrape_pdf_links(page_url)
-    print(f"Found {len(pdf_entries)} PDFs for {year}")
-
-    for entry in pdf_entries:
-        pdf_path = download_pdf(entry["url"], folder=f"pdfs/{year}")
-        if not pdf_path:
-            continue
-
-        text = extract_text(pdf_path)
-        if not text.strip():
-            print(f"No text extracted from {pdf_path}")
-            continue
-
-        keyword_counts, summary = find_keywords_and_sentences(text)
-        if entry["date"] is None:
-            print(f"Skipping {entry['title']}: no date found")
-            continue
 
-        row = {
-            "title": entry["title"],
-            "date": entry["date"].strftime("%Y-%m-%d"),
-            "quarter": get_quarter(entry["date"]),
-            "keyword_counts": keyword_counts,
-            "summary": summary
+def main():
+    written = 0
+
+    # Threads for the network-bound downloads, processes for the CPU-bound
+    # PDF parsing and keyword scan (one worker per core).
+    # Rows stream into a temp file that replaces CSV_FILE only once the whole
+    # run succeeds, so a failed run leaves the previous CSV untouched.
+    tmp_csv = CSV_FILE + ".part"
+    with open(tmp_csv, "w", newline="", encoding="utf-8") as f, \
+            ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloader, \
+            ProcessPoolExecutor() as parser:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+        # Fetch every year's index page at once; they are independent
+        index_pages = {
+            year: downloader.submit(scrape_pdf_links, page_url)
+            for year, page_url in urls.items()
         }
-        all_rows.append(row)
 
-# Save to CSV
-df = pd.DataFrame(all_rows)
-df.to_csv(CSV_FILE, index=False)
-print(f"\n✅ CSV created: {CSV_FILE} ({len(df)} entries)")
+        for year, index_page in index_pages.items():
+            print(f"\nScraping {year} CSA page...")
+            pdf_entries = index_page.result()
+            print(f"Found {len(pdf_entries)} PDFs for {year}")
+
+            # Undated entries can't be placed in a quarter; drop them before
+            # spending a download and a parse on them
+            dated = [e for e in pdf_entries if e["date"] is not None]
+            if len(dated) < len(pdf_entries):
+                print(f"Skipping {len(pdf_entries) - len(dated)} PDFs with no date found")
+            pdf_entries = dated
+
+            # List the year's folder once rather than stat() each PDF
+            folder = f"pdfs/{year}"
+            os.makedirs(folder, exist_ok=True)
+            existing = {e.name for e in os.scandir(folder)}
+
+            # Start every download for the year, then process them in page order.
+            # Links with the same file name share one download (and one parse),
+            # as they did when the loop was serial; two concurrent downloads
+            # would race on the same .part file.
+            by_name = {}
+            downloads = []
+            for entry in pdf_entries:
+                filename = os.path.basename(entry["url"])
+                if filename not in by_name:
+                    by_name[filename] = downloader.submit(
+                        download_pdf, entry["url"], folder=folder, existing=existing
+                    )
+                downloads.append((entry, by_name[filename]))
+
+            # Hand each PDF to the process pool as soon as it is on disk
+            analyses = []
+            by_path = {}
+            for entry, future in downloads:
+                pdf_path = future.result()
+                if not pdf_path:
+                    continue
+                if pdf_path not in by_path:
+                    by_path[pdf_path] = parser.submit(analyze_pdf, pdf_path)
+                analyses.append((entry, pdf_path, by_path[pdf_path]))
+
+            # Collect in page order so the CSV is the same on every run
+            for entry, pdf_path, future in analyses:
+                result = future.result()
+                if result is None:
+                    print(f"No text extracted from {pdf_path}")
+                    continue
+
+                keyword_counts, summary = result
+                row = {
+                    "title": entry["title"],
+                    "date": entry["date"].strftime("%Y-%m-%d"),
+                    "quarter": get_quarter(entry["date"]),
+                    # JSON (not Python repr) so readers can use json/orjson.loads
+                    "keyword_counts": json.dumps(keyword_counts),
+                    "summary": summary
+                }
+                writer.writerow(row)
+                written += 1
+
+    os.replace(tmp_csv, CSV_FILE)
+    print(f"\n✅ CSV created: {CSV_FILE} ({written} entries)")
+
+
+if __name__ == "__main__":
+    main()
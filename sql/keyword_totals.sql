@@ -0,0 +1,31 @@
+-- keyword_totals.sql
+-- Pre-aggregated keyword counts for the dashboard.
+-- Run once in the Supabase SQL editor; the app calls these through sb.rpc(...)
+
+create or replace view v_keyword_year as
+select year, keyword::text as keyword, sum(count)::int as count
+from fraud_reports
+group by year, keyword;
+
+-- (year, keyword, count) rows, optionally for a single year
+create or replace function keyword_totals(p_year int default null)
+returns setof v_keyword_year
+language sql stable
+as $$
+  select *
+  from v_keyword_year
+  where p_year is null or year = p_year;
+$$;
+
+-- Top k keywords by total mentions, optionally for a single year
+create or replace function keyword_top_k(p_k int, p_year int default null)
+returns table (keyword text, count int)
+language sql stable
+as $$
+  select keyword, sum(count)::int as count
+  from v_keyword_year
+  where p_year is null or year = p_year
+  group by keyword
+  order by 2 desc
+  limit p_k;
+$$;